@@ -1,17 +1,20 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { GoogleMeetRESTService } from '@/lib/meet-rest-service';
-import { GoogleMeetOAuthService } from '../../../lib/oauth-service';
-import GoogleMeetRecordingManager from '../../../lib/recording-manager';
-
-// Store active recording sessions - in production, use Redis or database
-const activeRecordings = new Map<string, {
-  sessionId: string;
-  meetingCode: string;
-  spaceId: string;
-  startTime: number;
-  status: 'starting' | 'connected' | 'recording' | 'error';
-  recordingManager: GoogleMeetRecordingManager;
-}>();
+import { GoogleMeetOAuthService, OAuthToken } from '../../../lib/oauth-service';
+import { activeRecordings, ActiveRecording, countRunningRecordings, recordingManager } from '../../../lib/recording-store';
+
+// Access token reused across requests until it is about to expire
+let cachedToken: OAuthToken | null = null;
+
+// Refresh in flight, shared by concurrent requests that find the token expired
+let tokenRefresh: Promise<OAuthToken> | null = null;
+
+// Each recording holds a peer connection and a MediaRecorder, so cap how many run at once
+const DEFAULT_MAX_CONCURRENT_RECORDINGS = 4;
+const configuredMaxRecordings = Number(process.env.MAX_CONCURRENT_RECORDINGS);
+const MAX_CONCURRENT_RECORDINGS = Number.isInteger(configuredMaxRecordings) && configuredMaxRecordings > 0
+  ? configuredMaxRecordings
+  : DEFAULT_MAX_CONCURRENT_RECORDINGS;
 
 export async function POST(req: NextRequest) {
   try {
@@ -43,12 +46,10 @@ export async function POST(req: NextRequest) {
       );
     }
 
-    // Get OAuth access token
-    const accessToken = await getAccessToken();
-    if (!accessToken) {
+    if (countRunningRecordings() >= MAX_CONCURRENT_RECORDINGS) {
       return NextResponse.json(
-        { error: 'Failed to obtain access token' },
-        { status: 401 }
+        { error: 'Too many recordings in progress, try again later' },
+        { status: 503 }
       );
     }
 
@@ -61,86 +62,131 @@ export async function POST(req: NextRequest) {
       );
     }
 
-    // Initialize Meet REST API service
-    const meetService = new GoogleMeetRESTService(accessToken);
-
-    // Get space information from meeting code
-    const spaceId = await meetService.getSpaceIdFromMeetingCode(meetingCode);
-    
-    console.log('Found space:', spaceId);
-
-    // Initialize recording manager
-    const recordingManager = new GoogleMeetRecordingManager(accessToken);
-
-    // Initialize recording session in our tracking
-    const sessionData: {
-      sessionId: string;
-      meetingCode: string;
-      spaceId: string;
-      startTime: number;
-      status: 'starting' | 'connected' | 'recording' | 'error';
-      recordingManager: GoogleMeetRecordingManager;
-    } = {
+    // Claim the meeting before the first await, so a concurrent request
+    // for the same meeting sees it and gets a 409 instead of starting twice
+    const startTime = Date.now();
+    const sessionData: ActiveRecording = {
       sessionId: '', // Will be filled after starting
       meetingCode,
-      spaceId,
-      startTime: Date.now(),
+      spaceId: '', // Will be filled after the lookup below
+      startTime,
+      startTimeISO: new Date(startTime).toISOString(),
       status: 'starting',
       recordingManager
     };
 
     activeRecordings.set(meetingCode, sessionData);
 
+    // Get OAuth access token
+    const accessToken = await getAccessToken();
+    if (!accessToken) {
+      activeRecordings.delete(meetingCode);
+      return NextResponse.json(
+        { error: 'Failed to obtain access token' },
+        { status: 401 }
+      );
+    }
+
+    // Initialize Meet REST API service
+    const meetService = new GoogleMeetRESTService(accessToken);
+
+    // Get space information from meeting code
+    let spaceId: string;
     try {
-      // Start the actual recording process
-      console.log('Starting WebRTC recording process...');
-      
-      const sessionId = await recordingManager.startRecording({
-        meetingCode,
-        meetingId,
-        cloudProjectNumber,
-        accessToken,
-        recordingQuality: 'HD',
-        includeAudio: true,
-        includeVideo: true
-      });
+      spaceId = await meetService.getSpaceIdFromMeetingCode(meetingCode);
+    } catch (error) {
+      activeRecordings.delete(meetingCode);
+      throw error;
+    }
+    sessionData.spaceId = spaceId;
+
+    // Force stopped during the lookups above - don't connect at all
+    if (sessionData.status === 'cancelling') {
+      activeRecordings.delete(meetingCode);
+      return NextResponse.json(
+        { error: 'Recording was cancelled before it started' },
+        { status: 409 }
+      );
+    }
+    
+    console.log('Found space:', spaceId);
+
+    // Connecting to the conference can take tens of seconds, so run it in
+    // the background and let the client poll GET for the final status
+    console.log('Starting WebRTC recording process...');
+
+    sessionData.startAbort = new AbortController();
+
+    recordingManager.startRecording({
+      meetingCode,
+      meetingId,
+      cloudProjectNumber,
+      accessToken,
+      spaceId,
+      recordingQuality: 'HD',
+      includeAudio: true,
+      includeVideo: true
+    }, sessionData.startAbort.signal).then((sessionId) => {
+      sessionData.startAbort = undefined;
+
+      // Force stopped while connecting - nothing can reach this session any
+      // more, so tear it down rather than leave its recorder running
+      if (activeRecordings.get(meetingCode) !== sessionData || sessionData.status === 'cancelling') {
+        console.log('Recording was cancelled while starting, stopping:', sessionId);
+        // Release the meeting only once the session is down, so a new start
+        // can't overlap the one being torn down
+        recordingManager.stopRecording(sessionId).catch((stopError) => {
+          console.error('Failed to stop cancelled recording:', stopError);
+        }).finally(() => {
+          if (activeRecordings.get(meetingCode) === sessionData) {
+            activeRecordings.delete(meetingCode);
+          }
+        });
+        return;
+      }
 
       // Update session with the returned session ID
       sessionData.sessionId = sessionId;
       sessionData.status = 'recording';
 
       console.log('Recording started successfully:', sessionId);
+    }).catch((recordingError) => {
+      sessionData.startAbort = undefined;
+      console.error('Failed to start recording process:', recordingError);
 
-      return NextResponse.json({ 
-        success: true,
-        message: 'Recording started successfully',
-        data: {
-          sessionId,
-          meetingCode,
-          spaceId,
-          startTime: new Date(sessionData.startTime).toISOString()
+      // Nobody is waiting on a cancelled start, so don't keep its error around
+      if (sessionData.status === 'cancelling') {
+        if (activeRecordings.get(meetingCode) === sessionData) {
+          activeRecordings.delete(meetingCode);
         }
-      });
-
-    } catch (recordingError) {
-      console.error('Failed to start recording process:', recordingError);
+        return;
+      }
       
       // Update status to error
       sessionData.status = 'error';
+      sessionData.error = recordingError instanceof Error ? recordingError.message : 'Unknown error';
       
-      // Clean up after a delay
+      // Clean up after a delay, unless the entry was already replaced by a new start
       setTimeout(() => {
-        activeRecordings.delete(meetingCode);
+        if (activeRecordings.get(meetingCode) === sessionData) {
+          activeRecordings.delete(meetingCode);
+        }
       }, 60000); // Clean up after 1 minute
+    });
 
-      return NextResponse.json(
-        { 
-          error: 'Failed to start recording',
-          details: recordingError instanceof Error ? recordingError.message : 'Unknown error'
-        },
-        { status: 500 }
-      );
-    }
+    return NextResponse.json(
+      { 
+        success: true,
+        message: 'Recording is starting',
+        data: {
+          meetingCode,
+          spaceId,
+          status: sessionData.status,
+          startTime: sessionData.startTimeISO
+        }
+      },
+      { status: 202 }
+    );
 
   } catch (error) {
     console.error('Error in start recording API:', error);
@@ -151,6 +197,29 @@ export async function POST(req: NextRequest) {
   }
 }
 
+// Built on first use so credentials are read at request time, not at import
+let oauthService: GoogleMeetOAuthService | null = null;
+
+function getOAuthService(): GoogleMeetOAuthService | null {
+  if (oauthService) {
+    return oauthService;
+  }
+
+  const clientId = process.env.GOOGLE_CLIENT_ID;
+  const clientSecret = process.env.GOOGLE_CLIENT_SECRET;
+
+  if (!clientId || !clientSecret) {
+    return null;
+  }
+
+  oauthService = new GoogleMeetOAuthService({
+    clientId,
+    clientSecret,
+    redirectUri: process.env.OAUTH_REDIRECT_URI || 'http://localhost:3000/auth/callback'
+  });
+  return oauthService;
+}
+
 async function getAccessToken(): Promise<string | null> {
   try {
     // Implementation for getting OAuth access token
@@ -159,23 +228,26 @@ async function getAccessToken(): Promise<string | null> {
     // 2. Using stored user tokens with refresh capability
     // 3. Using application default credentials for server-to-server auth
 
-    const clientId = process.env.GOOGLE_CLIENT_ID;
-    const clientSecret = process.env.GOOGLE_CLIENT_SECRET;
+    const oauthService = getOAuthService();
     const refreshToken = process.env.GOOGLE_REFRESH_TOKEN;
 
-    if (!clientId || !clientSecret || !refreshToken) {
+    if (!oauthService || !refreshToken) {
       console.error('Missing required OAuth environment variables');
       return null;
     }
 
-    const oauthService = new GoogleMeetOAuthService({
-      clientId,
-      clientSecret,
-      redirectUri: process.env.OAUTH_REDIRECT_URI || 'http://localhost:3000/auth/callback'
-    });
+    if (cachedToken && !oauthService.isTokenExpired(cachedToken)) {
+      return cachedToken.accessToken;
+    }
 
-    const token = await oauthService.refreshAccessToken(refreshToken);
-    return token.accessToken;
+    if (!tokenRefresh) {
+      tokenRefresh = oauthService.refreshAccessToken(refreshToken).finally(() => {
+        tokenRefresh = null;
+      });
+    }
+
+    cachedToken = await tokenRefresh;
+    return cachedToken.accessToken;
 
   } catch (error) {
     console.error('Failed to get access token:', error);
@@ -222,11 +294,9 @@ export async function GET(req: NextRequest) {
     sessionId: session.sessionId,
     meetingCode: session.meetingCode,
     status: session.status,
+    error: session.error,
     duration: Date.now() - session.startTime,
-    startTime: new Date(session.startTime).toISOString(),
+    startTime: session.startTimeISO,
     recordingStats
   });
 }
-
-// Export the activeRecordings map for use in other API routes
-export { activeRecordings };
\ No newline at end of file
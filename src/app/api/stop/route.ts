@@ -1,23 +1,9 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { v2 as cloudinary } from 'cloudinary';
-
-// Configure Cloudinary
-cloudinary.config({
-  cloud_name: process.env.CLOUDINARY_CLOUD_NAME!,
-  api_key: process.env.CLOUDINARY_API_KEY!,
-  api_secret: process.env.CLOUDINARY_API_SECRET!
-});
-
-// Import the activeRecordings map from the start route
-// In production, use a shared database or Redis
-const activeRecordings = new Map<string, {
-  sessionId: string;
-  meetingCode: string;
-  spaceId: string;
-  startTime: number;
-  status: 'starting' | 'connected' | 'recording' | 'error';
-  recordingManager: any; // GoogleMeetRecordingManager instance
-}>();
+import { cloudinary } from '../../../lib/cloudinary';
+import { activeRecordings } from '../../../lib/recording-store';
+
+// Characters in an ISO timestamp that aren't safe in a Cloudinary public_id
+const UNSAFE_TIMESTAMP_CHARS = /[:.]/g;
 
 export async function POST(req: NextRequest) {
   try {
@@ -97,7 +83,7 @@ export async function POST(req: NextRequest) {
           meetingCode,
           duration: duration,
           durationMinutes,
-          startTime: new Date(recordingSession.startTime).toISOString(),
+          startTime: recordingSession.startTimeISO,
           endTime: new Date().toISOString(),
           recordingStats: recordingStats ? {
             participants: recordingStats.participants?.length || 0,
@@ -156,7 +142,7 @@ async function uploadToCloudinary(
     const buffer = Buffer.from(arrayBuffer);
 
     // Generate filename with timestamp and meeting code
-    const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
+    const timestamp = new Date().toISOString().replace(UNSAFE_TIMESTAMP_CHARS, '-');
     const filename = `meet-recording-${metadata.meetingCode}-${timestamp}`;
 
     // Upload to Cloudinary with enhanced options
@@ -259,7 +245,7 @@ export async function GET(req: NextRequest) {
           sessionId: session.sessionId,
           status: session.status,
           duration: Date.now() - session.startTime,
-          startTime: new Date(session.startTime).toISOString(),
+          startTime: session.startTimeISO,
           recordingStats
         };
       });
@@ -300,7 +286,7 @@ export async function GET(req: NextRequest) {
         meetingCode: session.meetingCode,
         status: session.status,
         duration: Date.now() - session.startTime,
-        startTime: new Date(session.startTime).toISOString(),
+        startTime: session.startTimeISO,
         recordingStats
       });
     }
@@ -340,6 +326,22 @@ export async function DELETE(req: NextRequest) {
       );
     }
 
+    // Still connecting, so there is no session to stop yet. Mark the entry;
+    // the start route tears the session down as soon as it is created, and
+    // keeping the entry until then stops a new start claiming the meeting
+    if (session.status === 'starting' || session.status === 'cancelling') {
+      session.status = 'cancelling';
+      session.startAbort?.abort();
+      return NextResponse.json(
+        {
+          success: true,
+          message: 'Recording is still starting and will be stopped once connected',
+          meetingCode
+        },
+        { status: 202 }
+      );
+    }
+
     try {
       // Force stop the recording
       if (session.recordingManager && session.sessionId) {
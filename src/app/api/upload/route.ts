@@ -1,31 +1,43 @@
 import { NextResponse } from "next/server";
-import { v2 as cloudinary } from "cloudinary";
-
-cloudinary.config({
-  cloud_name: process.env.CLOUDINARY_CLOUD_NAME!,
-  api_key: process.env.CLOUDINARY_API_KEY!,
-  api_secret: process.env.CLOUDINARY_API_SECRET!
-});
+import type { UploadApiResponse } from "cloudinary";
+import { cloudinary } from "@/lib/cloudinary";
 
 export async function POST(request: Request) {
-  const data = await request.formData();
-  const file = data.get("file") as File;
-
-  const buffer = Buffer.from(await file.arrayBuffer());
+  try {
+    const data = await request.formData();
+    const file = data.get("file");
 
-  const uploaded = await cloudinary.uploader.upload_stream(
-    { resource_type: "video", folder: "meet-recordings" },
-    (error, result) => {
-      if (error) throw error;
+    if (!(file instanceof File)) {
+      return NextResponse.json(
+        { error: "File is required" },
+        { status: 400 }
+      );
     }
-  );
 
-  const stream = cloudinary.uploader.upload_stream(
-    { resource_type: "video", folder: "meet-recordings" },
-    (err, result) => {}
-  );
+    const buffer = Buffer.from(await file.arrayBuffer());
+
+    // A single upload stream; the result arrives through its callback
+    const result = await new Promise<UploadApiResponse | undefined>((resolve, reject) => {
+      const stream = cloudinary.uploader.upload_stream(
+        { resource_type: "video", folder: "meet-recordings" },
+        (error, result) => {
+          if (error) reject(error);
+          else resolve(result);
+        }
+      );
 
-  stream.end(buffer);
+      stream.end(buffer);
+    });
 
-  return NextResponse.json({ status: "ok" });
-}
+    return NextResponse.json({ status: "ok", public_id: result?.public_id });
+  } catch (error) {
+    console.error("Error in upload API:", error);
+    return NextResponse.json(
+      {
+        error: "Failed to upload recording",
+        details: error instanceof Error ? error.message : "Unknown error"
+      },
+      { status: 500 }
+    );
+  }
+}
\ No newline at end of file
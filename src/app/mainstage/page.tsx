@@ -54,8 +54,9 @@ export default function MainStagePage() {
   useEffect(() => {
     if (!recordingStatus.isRecording || !recordingStatus.startTime) return;
 
+    // Parse once; only the current time changes between ticks
+    const startTime = new Date(recordingStatus.startTime).getTime();
     const interval = setInterval(() => {
-      const startTime = new Date(recordingStatus.startTime!).getTime();
       const duration = Date.now() - startTime;
       setRecordingStatus(prev => ({ ...prev, duration }));
     }, 1000);
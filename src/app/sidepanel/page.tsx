@@ -1,6 +1,6 @@
 'use client';
 
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import {
   meet,
   MeetSidePanelClient,
@@ -8,11 +8,56 @@ import {
 } from '@googleworkspace/meet-addons/meet.addons';
 
 type RecordingStatus = 'idle' | 'starting' | 'recording' | 'stopping' | 'error';
+
+// The start request returns as soon as the recording is accepted; connecting
+// to the meeting finishes in the background, so poll until it settles
+const START_POLL_INTERVAL_MS = 2000;
+// Just over the server's 30s conference wait plus its 10s wait for streams
+const START_TIMEOUT_MS = 45000;
+
+async function waitForRecordingToStart(meetingCode: string, signal: AbortSignal): Promise<void> {
+  const deadline = Date.now() + START_TIMEOUT_MS;
+
+  while (Date.now() < deadline) {
+    await new Promise<void>((resolve, reject) => {
+      const onAbort = () => {
+        clearTimeout(timer);
+        reject(signal.reason);
+      };
+      const timer = setTimeout(() => {
+        signal.removeEventListener('abort', onAbort);
+        resolve();
+      }, START_POLL_INTERVAL_MS);
+      signal.addEventListener('abort', onAbort);
+      if (signal.aborted) {
+        onAbort();
+      }
+    });
+
+    const res = await fetch(`/api/recording/start?meetingCode=${encodeURIComponent(meetingCode)}`, { signal });
+    if (!res.ok) {
+      throw new Error(await res.text());
+    }
+
+    const data = await res.json();
+    if (data.status === 'recording') {
+      return;
+    }
+    if (data.status === 'error') {
+      throw new Error(data.error || 'Failed to start recording');
+    }
+  }
+
+  throw new Error('Timed out waiting for the recording to start');
+}
+
 export default function SidePanelPage() {
   const [sidePanelClient, setSidePanelClient] = useState<MeetSidePanelClient>();
   const [meetingInfo, setMeetingInfo] = useState<MeetingInfo | null>(null);
   const [status, setStatus] = useState<RecordingStatus>('idle');
   const [error, setError] = useState<string | null>(null);
+  // Aborted when the panel unmounts, to stop any start-status polling
+  const panelLifetime = useRef(new AbortController());
 
   // TODO: replace with your real project number
   const CLOUD_PROJECT_NUMBER = '693246358019';
@@ -36,11 +81,19 @@ export default function SidePanelPage() {
     })();
   }, []);
 
+  useEffect(() => {
+    const lifetime = new AbortController();
+    panelLifetime.current = lifetime;
+    return () => lifetime.abort();
+  }, []);
+
   async function startRecording() {
     if (!meetingInfo) return;
     setStatus('starting');
     setError(null);
 
+    const { signal } = panelLifetime.current;
+
     try {
       const res = await fetch('/api/recording/start', {
         method: 'POST',
@@ -55,8 +108,11 @@ export default function SidePanelPage() {
         throw new Error(await res.text());
       }
 
+      const { data } = await res.json();
+      await waitForRecordingToStart(data.meetingCode, signal);
       setStatus('recording');
     } catch (e: any) {
+      if (signal.aborted) return; // Panel was closed
       console.error('Error starting recording:', e);
       setStatus('error');
       setError(e.message || 'Failed to start recording');
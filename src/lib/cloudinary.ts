@@ -0,0 +1,13 @@
+// Cloudinary client shared by the API routes
+// Configured once when first imported rather than in every route module
+
+import { v2 as cloudinary } from 'cloudinary';
+
+cloudinary.config({
+  cloud_name: process.env.CLOUDINARY_CLOUD_NAME!,
+  api_key: process.env.CLOUDINARY_API_KEY!,
+  api_secret: process.env.CLOUDINARY_API_SECRET!
+});
+
+export { cloudinary };
+export default cloudinary;
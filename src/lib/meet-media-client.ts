@@ -1,10 +1,18 @@
 // Enhanced Google Meet Media API Client with Complete WebRTC Implementation
 // Based on the official Google Meet Media API TypeScript reference
 
+// Verbose payload logging is only worth its cost outside production;
+// MEET_DEBUG_LOGGING=true|false overrides the default either way
+const DEBUG_LOGGING = process.env.MEET_DEBUG_LOGGING
+  ? process.env.MEET_DEBUG_LOGGING === 'true'
+  : process.env.NODE_ENV !== 'production';
+
 export interface MeetMediaConfig {
   cloudProjectNumber: string;
   oAuthToken: string;
   meetingSpaceId: string;
+  includeVideo?: boolean; // Defaults to true; audio-only sessions skip video entirely
+  recordingQuality?: 'HD' | 'SD'; // Defaults to HD
 }
 
 export interface MeetMediaStream {
@@ -29,6 +37,43 @@ export interface ParticipantInfo {
 }
 
 export class MeetMediaAPIClient {
+  // Shared by every connection; built once rather than per initializeConnection()
+  private static readonly RTC_CONFIGURATION: RTCConfiguration = {
+    iceServers: [
+      {
+        urls: [
+          'stun:stun.l.google.com:19302',
+          'stun:stun1.l.google.com:19302',
+          'stun:stun2.l.google.com:19302'
+        ]
+      }
+    ],
+    // max-bundle puts every m-line on one transport, so a single
+    // pre-gathered candidate set is all that can ever be used
+    iceCandidatePoolSize: 1,
+    bundlePolicy: 'max-bundle',
+    rtcpMuxPolicy: 'require'
+  };
+
+  // MediaRecorder encoder bitrates per recording quality
+  private static readonly RECORDING_BITRATES = {
+    HD: { videoBitsPerSecond: 2500000, audioBitsPerSecond: 128000 }, // 2.5 Mbps / 128 kbps
+    SD: { videoBitsPerSecond: 1000000, audioBitsPerSecond: 96000 }   // 1 Mbps / 96 kbps
+  };
+
+  // Recording MIME types in order of preference
+  private static readonly PREFERRED_MIME_TYPES = [
+    'video/webm;codecs=vp9,opus',
+    'video/webm;codecs=vp8,opus',
+    'video/webm;codecs=h264,opus',
+    'video/webm',
+    'video/mp4'
+  ];
+  private static bestMimeType: string | null = null;
+
+  // Every DTLS setup line in the offer, rewritten to the client role
+  private static readonly SDP_SETUP_LINE = /a=setup:.*\r\n/g;
+
   private config: MeetMediaConfig;
   private peerConnection: RTCPeerConnection | null = null;
   private dataChannel: RTCDataChannel | null = null;
@@ -39,6 +84,14 @@ export class MeetMediaAPIClient {
   private remoteStreams: Map<string, MeetMediaStream> = new Map();
   private participants: Map<string, ParticipantInfo> = new Map();
   private recordingStream: MediaStream | null = null;
+  private trackWaiters: Array<() => void> = [];
+  private connectionWaiters: Array<() => void> = [];
+
+  // Invoked whenever the participant list changes over the data channel
+  onParticipantsChanged?: (participants: ParticipantInfo[]) => void;
+
+  // Invoked with each chunk the MediaRecorder hands back
+  onRecordingChunk?: (chunk: Blob) => void;
 
   constructor(config: MeetMediaConfig) {
     this.config = config;
@@ -55,16 +108,7 @@ export class MeetMediaAPIClient {
       console.log('Initializing WebRTC connection for Meet Media API');
 
       // Create RTCPeerConnection with proper configuration for Meet Media API
-      this.peerConnection = new RTCPeerConnection({
-        iceServers: [
-          { urls: 'stun:stun.l.google.com:19302' },
-          { urls: 'stun:stun1.l.google.com:19302' },
-          { urls: 'stun:stun2.l.google.com:19302' }
-        ],
-        iceCandidatePoolSize: 10,
-        bundlePolicy: 'max-bundle',
-        rtcpMuxPolicy: 'require'
-      });
+      this.peerConnection = new RTCPeerConnection(MeetMediaAPIClient.RTC_CONFIGURATION);
 
       // Set up data channel for Meet Media API communication
       this.dataChannel = this.peerConnection.createDataChannel('meetMediaAPI', {
@@ -74,33 +118,15 @@ export class MeetMediaAPIClient {
 
       // Add transceivers as required by Meet Media API
       // The API requires exactly 3 receive-only audio media descriptions
+      // No per-receiver setup is needed before the offer is created
       for (let i = 0; i < 3; i++) {
-        const audioTransceiver = this.peerConnection.addTransceiver('audio', {
-          direction: 'recvonly'
-        });
-        
-        // Configure audio transceiver for optimal quality
-        if (audioTransceiver.receiver) {
-          try {
-            await audioTransceiver.receiver.getStats();
-          } catch (error) {
-            console.warn('Could not get audio receiver stats:', error);
-          }
-        }
+        this.peerConnection.addTransceiver('audio', { direction: 'recvonly' });
       }
 
-      // Add video transceiver for receiving video streams
-      const videoTransceiver = this.peerConnection.addTransceiver('video', {
-        direction: 'recvonly'
-      });
-
-      // Configure video transceiver for optimal quality
-      if (videoTransceiver.receiver) {
-        try {
-          await videoTransceiver.receiver.getStats();
-        } catch (error) {
-          console.warn('Could not get video receiver stats:', error);
-        }
+      // Add video transceiver for receiving video streams, unless the
+      // session is audio-only and would just discard the video bytes
+      if (this.config.includeVideo !== false) {
+        this.peerConnection.addTransceiver('video', { direction: 'recvonly' });
       }
 
       // Set up event listeners
@@ -125,7 +151,9 @@ export class MeetMediaAPIClient {
     // Handle ICE candidates
     this.peerConnection.onicecandidate = (event) => {
       if (event.candidate) {
-        console.log('ICE candidate generated:', event.candidate.candidate);
+        if (DEBUG_LOGGING) {
+          console.log('ICE candidate generated:', event.candidate.candidate);
+        }
         // ICE candidates are automatically handled by the WebRTC stack
         // Meet Media API uses the REST API for signaling
       }
@@ -137,10 +165,15 @@ export class MeetMediaAPIClient {
       console.log('Connection state changed:', state);
       
       switch (state) {
-        case 'connected':
+        case 'connected': {
           this.isConnected = true;
           this.onConnectionEstablished();
+
+          const waiters = this.connectionWaiters;
+          this.connectionWaiters = [];
+          waiters.forEach(resolve => resolve());
           break;
+        }
         case 'disconnected':
         case 'failed':
           this.isConnected = false;
@@ -173,7 +206,9 @@ export class MeetMediaAPIClient {
       };
 
       this.dataChannel.onmessage = (event) => {
-        console.log('Data channel message received:', event.data);
+        if (DEBUG_LOGGING) {
+          console.log('Data channel message received:', event.data);
+        }
         this.handleDataChannelMessage(event.data);
       };
 
@@ -214,6 +249,13 @@ export class MeetMediaAPIClient {
 
     this.remoteStreams.set(streamId, remoteStream);
 
+    // Wake up anyone waiting for a live remote track
+    if (this.hasLiveRemoteTrack()) {
+      const waiters = this.trackWaiters;
+      this.trackWaiters = [];
+      waiters.forEach(resolve => resolve());
+    }
+
     // Add to recording stream if recording is active
     if (this.isRecording && this.recordingStream) {
       this.recordingStream.addTrack(track);
@@ -225,14 +267,17 @@ export class MeetMediaAPIClient {
       this.handleTrackEnded(streamId, track.kind);
     };
 
-    // Track mute/unmute handlers
-    track.onmute = () => {
-      console.log(`${track.kind} track muted for stream:`, streamId);
-    };
+    // Track mute/unmute handlers - these fire whenever a participant toggles
+    // their camera or mic, so only log them when debugging
+    if (DEBUG_LOGGING) {
+      track.onmute = () => {
+        console.log('Track muted for stream:', track.kind, streamId);
+      };
 
-    track.onunmute = () => {
-      console.log(`${track.kind} track unmuted for stream:`, streamId);
-    };
+      track.onunmute = () => {
+        console.log('Track unmuted for stream:', track.kind, streamId);
+      };
+    }
   }
 
   private handleAudioTrack(track: MediaStreamTrack, stream: MediaStream): void {
@@ -254,12 +299,14 @@ export class MeetMediaAPIClient {
     // You could implement video analytics here
     // Such as resolution detection, frame rate monitoring, etc.
     
-    const settings = track.getSettings();
-    console.log('Video track settings:', {
-      width: settings.width,
-      height: settings.height,
-      frameRate: settings.frameRate
-    });
+    if (DEBUG_LOGGING) {
+      const settings = track.getSettings();
+      console.log('Video track settings:', {
+        width: settings.width,
+        height: settings.height,
+        frameRate: settings.frameRate
+      });
+    }
   }
 
   private handleTrackEnded(streamId: string, trackKind: string): void {
@@ -313,7 +360,9 @@ export class MeetMediaAPIClient {
   private handleDataChannelMessage(data: string): void {
     try {
       const message = JSON.parse(data);
-      console.log('Parsed data channel message:', message);
+      if (DEBUG_LOGGING) {
+        console.log('Parsed data channel message:', message);
+      }
 
       switch (message.type) {
         case 'participant_joined':
@@ -353,6 +402,7 @@ export class MeetMediaAPIClient {
         audioEnabled: true,
         videoEnabled: true
       });
+      this.notifyParticipantsChanged();
     }
   }
 
@@ -361,6 +411,7 @@ export class MeetMediaAPIClient {
     
     if (data.participantId) {
       this.participants.delete(data.participantId);
+      this.notifyParticipantsChanged();
     }
   }
 
@@ -372,10 +423,17 @@ export class MeetMediaAPIClient {
       if (participant) {
         // Update participant info
         Object.assign(participant, data.updates || {});
+        this.notifyParticipantsChanged();
       }
     }
   }
 
+  private notifyParticipantsChanged(): void {
+    if (this.onParticipantsChanged) {
+      this.onParticipantsChanged(this.getParticipants());
+    }
+  }
+
   private handleMediaUpdate(data: any): void {
     console.log('Media update:', data);
     // Handle media stream updates, quality changes, etc.
@@ -402,7 +460,7 @@ export class MeetMediaAPIClient {
       // Create SDP offer with specific constraints for Meet Media API
       const offer = await this.peerConnection.createOffer({
         offerToReceiveAudio: true,
-        offerToReceiveVideo: true
+        offerToReceiveVideo: this.config.includeVideo !== false
       });
 
       // Modify SDP for Meet Media API requirements
@@ -435,7 +493,7 @@ export class MeetMediaAPIClient {
     let modifiedSdp = sdp;
 
     // Ensure DTLS setup is correct (client role)
-    modifiedSdp = modifiedSdp.replace(/a=setup:.*\r\n/g, 'a=setup:active\r\n');
+    modifiedSdp = modifiedSdp.replace(MeetMediaAPIClient.SDP_SETUP_LINE, 'a=setup:active\r\n');
 
     // Ensure proper codec support
     // Meet Media API requires specific audio/video codecs
@@ -486,10 +544,21 @@ export class MeetMediaAPIClient {
   private updateRecordingStream(): void {
     if (!this.isRecording) return;
 
+    this.recordingStream = this.buildRecordingStream();
+
+    // Update MediaRecorder if it exists
+    if (this.mediaRecorder && this.mediaRecorder.state === 'recording') {
+      // Stop current recording and restart with new stream
+      this.mediaRecorder.stop();
+      this.startMediaRecorder();
+    }
+  }
+
+  private buildRecordingStream(): MediaStream {
     // Create a new MediaStream combining all remote tracks
     const combinedStream = new MediaStream();
 
-    this.remoteStreams.forEach((stream, streamId) => {
+    this.remoteStreams.forEach((stream) => {
       if (stream.audioTrack && stream.audioTrack.readyState === 'live') {
         combinedStream.addTrack(stream.audioTrack);
       }
@@ -498,14 +567,16 @@ export class MeetMediaAPIClient {
       }
     });
 
-    this.recordingStream = combinedStream;
+    return combinedStream;
+  }
 
-    // Update MediaRecorder if it exists
-    if (this.mediaRecorder && this.mediaRecorder.state === 'recording') {
-      // Stop current recording and restart with new stream
-      this.mediaRecorder.stop();
-      this.startMediaRecorder();
+  private hasLiveRemoteTrack(): boolean {
+    for (const stream of this.remoteStreams.values()) {
+      if (stream.audioTrack?.readyState === 'live' || stream.videoTrack?.readyState === 'live') {
+        return true;
+      }
     }
+    return false;
   }
 
   async startRecording(): Promise<void> {
@@ -520,19 +591,19 @@ export class MeetMediaAPIClient {
     try {
       console.log('Starting recording');
 
-      // Create combined stream from all remote streams
-      this.updateRecordingStream();
-
-      if (!this.recordingStream || this.recordingStream.getTracks().length === 0) {
-        // Wait a bit for streams to be established
-        await new Promise(resolve => setTimeout(resolve, 2000));
-        this.updateRecordingStream();
-        
-        if (!this.recordingStream || this.recordingStream.getTracks().length === 0) {
+      // Check for live tracks without building a throwaway MediaStream
+      if (!this.hasLiveRemoteTrack()) {
+        // Wait for streams to be established
+        await this.waitForRemoteTrack(2000).catch(() => undefined);
+
+        if (!this.hasLiveRemoteTrack()) {
           throw new Error('No media streams available for recording');
         }
       }
 
+      // Create combined stream from all remote streams
+      this.recordingStream = this.buildRecordingStream();
+
       await this.startMediaRecorder();
 
       this.isRecording = true;
@@ -553,17 +624,24 @@ export class MeetMediaAPIClient {
     // Determine the best codec
     const mimeType = this.getBestRecordingMimeType();
     
+    const bitrates = MeetMediaAPIClient.RECORDING_BITRATES[this.config.recordingQuality || 'HD'];
+
     this.mediaRecorder = new MediaRecorder(this.recordingStream, {
       mimeType,
-      videoBitsPerSecond: 2500000, // 2.5 Mbps
-      audioBitsPerSecond: 128000   // 128 kbps
+      ...bitrates
     });
 
     // Set up MediaRecorder event handlers
     this.mediaRecorder.ondataavailable = (event) => {
       if (event.data.size > 0) {
         this.recordingData.combinedChunks.push(event.data);
-        console.log(`Recording chunk collected: ${event.data.size} bytes`);
+        // Fires every second while recording
+        if (DEBUG_LOGGING) {
+          console.log('Recording chunk collected (bytes):', event.data.size);
+        }
+        if (this.onRecordingChunk) {
+          this.onRecordingChunk(event.data);
+        }
       }
     };
 
@@ -586,25 +664,26 @@ export class MeetMediaAPIClient {
   }
 
   private getBestRecordingMimeType(): string {
+    // Codec support can't change at runtime, so probe only once
+    if (MeetMediaAPIClient.bestMimeType) {
+      return MeetMediaAPIClient.bestMimeType;
+    }
+
     // Check for supported MIME types in order of preference
-    const preferredTypes = [
-      'video/webm;codecs=vp9,opus',
-      'video/webm;codecs=vp8,opus',
-      'video/webm;codecs=h264,opus',
-      'video/webm',
-      'video/mp4'
-    ];
-
-    for (const type of preferredTypes) {
-      if (MediaRecorder.isTypeSupported(type)) {
-        console.log('Using MIME type:', type);
-        return type;
-      }
+    let mimeType = MeetMediaAPIClient.PREFERRED_MIME_TYPES.find(
+      type => MediaRecorder.isTypeSupported(type)
+    );
+
+    if (mimeType) {
+      console.log('Using MIME type:', mimeType);
+    } else {
+      // Fallback to basic WebM
+      console.warn('No preferred MIME type supported, using default');
+      mimeType = 'video/webm';
     }
 
-    // Fallback to basic WebM
-    console.warn('No preferred MIME type supported, using default');
-    return 'video/webm';
+    MeetMediaAPIClient.bestMimeType = mimeType;
+    return mimeType;
   }
 
   async stopRecording(): Promise<Blob> {
@@ -681,6 +760,54 @@ export class MeetMediaAPIClient {
     }
   }
 
+  /**
+   * Resolve as soon as at least one live remote track is available,
+   * or reject once timeoutMs elapses without one
+   */
+  waitForRemoteTrack(timeoutMs: number): Promise<void> {
+    if (this.hasLiveRemoteTrack()) {
+      return Promise.resolve();
+    }
+
+    return new Promise((resolve, reject) => {
+      const onTrack = () => {
+        clearTimeout(timer);
+        resolve();
+      };
+
+      const timer = setTimeout(() => {
+        this.trackWaiters = this.trackWaiters.filter(waiter => waiter !== onTrack);
+        reject(new Error(`No remote track received within ${timeoutMs}ms`));
+      }, timeoutMs);
+
+      this.trackWaiters.push(onTrack);
+    });
+  }
+
+  /**
+   * Resolve once the peer connection reaches the 'connected' state,
+   * or reject once timeoutMs elapses without it
+   */
+  waitForConnected(timeoutMs: number): Promise<void> {
+    if (this.peerConnection?.connectionState === 'connected') {
+      return Promise.resolve();
+    }
+
+    return new Promise((resolve, reject) => {
+      const onConnected = () => {
+        clearTimeout(timer);
+        resolve();
+      };
+
+      const timer = setTimeout(() => {
+        this.connectionWaiters = this.connectionWaiters.filter(waiter => waiter !== onConnected);
+        reject(new Error(`Connection not established within ${timeoutMs}ms`));
+      }, timeoutMs);
+
+      this.connectionWaiters.push(onConnected);
+    });
+  }
+
   // Public getter methods
   getConnectionState(): string {
     return this.peerConnection?.connectionState || 'disconnected';
@@ -39,12 +39,33 @@ export interface Participant {
   };
 }
 
+export class MeetAPIError extends Error {
+  constructor(message: string, readonly status: number) {
+    super(message);
+    this.name = 'MeetAPIError';
+  }
+}
+
 export class GoogleMeetRESTService {
   private accessToken: string;
+  private readonly headers: Record<string, string>;
   private static readonly BASE_URL = 'https://meet.googleapis.com/v2beta';
 
+  private static readonly MEETING_CODE_PATTERN = /^[a-z0-9]{3}-[a-z0-9]{4}-[a-z0-9]{3}$/i;
+  private static readonly MEETING_URI_PATTERN = /meet\.google\.com\/([a-z0-9-]+)/i;
+
+  // Meeting codes map to a fixed space, so lookups are shared across instances.
+  // Bounded so a long-running server doesn't keep every code it has seen
+  private static readonly spaceIdCache = new Map<string, string>();
+  private static readonly SPACE_ID_CACHE_SIZE = 500;
+
   constructor(accessToken: string) {
     this.accessToken = accessToken;
+    // Same for every request made with this token, so build them once
+    this.headers = {
+      'Authorization': `Bearer ${accessToken}`,
+      'Content-Type': 'application/json'
+    };
   }
 
   private async makeRequest(endpoint: string, method = 'GET', body?: any): Promise<any> {
@@ -52,33 +73,30 @@ export class GoogleMeetRESTService {
     
     const options: RequestInit = {
       method,
-      headers: {
-        'Authorization': `Bearer ${this.accessToken}`,
-        'Content-Type': 'application/json'
-      }
+      headers: this.headers
     };
 
     if (body && (method === 'POST' || method === 'PATCH')) {
       options.body = JSON.stringify(body);
     }
 
-    try {
-      const response = await fetch(url, options);
-      
-      if (!response.ok) {
-        const errorText = await response.text();
-        throw new Error(`API request failed: ${response.status} ${response.statusText}. ${errorText}`);
-      }
+    // Errors propagate to the caller, which logs them once; expected failures
+    // (e.g. 404 while polling for a conference) are not logged at all
+    const response = await fetch(url, options);
 
-      if (response.status === 204) {
-        return null; // No content
-      }
+    if (!response.ok) {
+      const errorText = await response.text();
+      throw new MeetAPIError(
+        `API request to ${endpoint} failed: ${response.status} ${response.statusText}. ${errorText}`,
+        response.status
+      );
+    }
 
-      return await response.json();
-    } catch (error) {
-      console.error(`Failed to make request to ${endpoint}:`, error);
-      throw error;
+    if (response.status === 204) {
+      return null; // No content
     }
+
+    return await response.json();
   }
 
   /**
@@ -123,8 +141,8 @@ export class GoogleMeetRESTService {
   async getActiveConference(spaceName: string): Promise<Conference | null> {
     try {
       return await this.makeRequest(`/spaces/${spaceName}/activeConference`);
-    } catch (error: any) {
-      if (error.message.includes('404')) {
+    } catch (error) {
+      if (error instanceof MeetAPIError && error.status === 404) {
         return null; // No active conference
       }
       throw error;
@@ -252,45 +270,89 @@ export class GoogleMeetRESTService {
    * Get meeting space ID from meeting code
    */
   async getSpaceIdFromMeetingCode(meetingCode: string): Promise<string> {
-    try {
-      const space = await this.getSpaceByMeetingCode(meetingCode);
-      // Extract space ID from the space name
-      // Space names have format: "spaces/{spaceId}"
-      return space.name.split('/')[1];
-    } catch (error) {
-      console.error('Failed to get space ID from meeting code:', error);
-      throw error;
+    // Meeting codes are case-insensitive
+    const cacheKey = meetingCode.toLowerCase();
+    const cache = GoogleMeetRESTService.spaceIdCache;
+    const cached = cache.get(cacheKey);
+    if (cached) {
+      return cached;
+    }
+
+    const space = await this.getSpaceByMeetingCode(meetingCode);
+    // Extract space ID from the space name
+    // Space names have format: "spaces/{spaceId}"
+    const spaceId = space.name.split('/')[1];
+    // Maps iterate in insertion order, so the first key is the oldest entry
+    if (cache.size >= GoogleMeetRESTService.SPACE_ID_CACHE_SIZE) {
+      cache.delete(cache.keys().next().value!);
     }
+    cache.set(cacheKey, spaceId);
+    return spaceId;
   }
 
   /**
-   * Wait for active conference to start
+   * Wait for active conference to start; aborting the signal stops polling
    */
-  async waitForActiveConference(spaceName: string, timeoutMs = 60000, intervalMs = 5000): Promise<Conference> {
-    const startTime = Date.now();
-    
-    while (Date.now() - startTime < timeoutMs) {
+  async waitForActiveConference(
+    spaceName: string,
+    timeoutMs = 60000,
+    intervalMs = 5000,
+    signal?: AbortSignal
+  ): Promise<Conference> {
+    const deadline = Date.now() + timeoutMs;
+
+    while (true) {
+      signal?.throwIfAborted();
+
       try {
         const conference = await this.getActiveConference(spaceName);
         if (conference) {
           return conference;
         }
       } catch (error) {
-        console.log('No active conference yet, waiting...');
+        // A missing conference comes back as null, so anything caught here is
+        // a real failure. Client errors such as 401/403 won't fix themselves
+        if (error instanceof MeetAPIError && !GoogleMeetRESTService.isRetryableStatus(error.status)) {
+          throw error;
+        }
+        console.warn('Failed to check for active conference, retrying:', error);
+      }
+
+      // Never sleep past the deadline; always poll once more right at it
+      const remaining = deadline - Date.now();
+      if (remaining <= 0) {
+        break;
       }
-      
-      await new Promise(resolve => setTimeout(resolve, intervalMs));
+      await new Promise<void>(resolve => {
+        const wake = () => {
+          clearTimeout(timer);
+          signal?.removeEventListener('abort', wake);
+          resolve();
+        };
+        const timer = setTimeout(wake, Math.min(intervalMs, remaining));
+        signal?.addEventListener('abort', wake);
+        if (signal?.aborted) {
+          wake(); // Aborted while the last request was in flight
+        }
+      });
     }
     
     throw new Error(`No active conference found within ${timeoutMs}ms`);
   }
 
+  /**
+   * Whether a failed request is worth retrying (rate limits, timeouts, server errors)
+   */
+  private static isRetryableStatus(status: number): boolean {
+    return status === 408 || status === 429 || status >= 500;
+  }
+
   /**
    * Helper method to extract space name from meeting URI
    */
   static extractSpaceNameFromUri(meetingUri: string): string | null {
     // Meeting URIs typically have format: https://meet.google.com/abc-defg-hij
-    const match = meetingUri.match(/meet\.google\.com\/([a-z0-9-]+)/i);
+    const match = GoogleMeetRESTService.MEETING_URI_PATTERN.exec(meetingUri);
     return match ? match[1] : null;
   }
 
@@ -299,7 +361,7 @@ export class GoogleMeetRESTService {
    */
   static isValidMeetingCode(meetingCode: string): boolean {
     // Meeting codes are typically 10-12 characters with format: abc-defg-hij
-    return /^[a-z0-9]{3}-[a-z0-9]{4}-[a-z0-9]{3}$/i.test(meetingCode);
+    return GoogleMeetRESTService.MEETING_CODE_PATTERN.test(meetingCode);
   }
 }
 
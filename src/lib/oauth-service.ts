@@ -186,6 +186,11 @@ export class GoogleMeetOAuthService {
    * Validate token by making a test API call
    */
   async validateToken(token: OAuthToken): Promise<boolean> {
+    // An expired token can't be valid, so skip the round trip
+    if (this.isTokenExpired(token)) {
+      return false;
+    }
+
     try {
       const response = await fetch('https://www.googleapis.com/oauth2/v1/tokeninfo', {
         method: 'GET',
@@ -201,9 +206,9 @@ export class GoogleMeetOAuthService {
       const data = await response.json();
       
       // Check if token has required scopes
-      const tokenScopes = data.scope?.split(' ') || [];
+      const tokenScopes = new Set<string>(data.scope?.split(' ') || []);
       const hasRequiredScopes = GoogleMeetOAuthService.REQUIRED_SCOPES.every(
-        scope => tokenScopes.includes(scope)
+        scope => tokenScopes.has(scope)
       );
 
       return hasRequiredScopes;
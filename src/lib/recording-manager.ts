@@ -10,6 +10,7 @@ export interface RecordingConfig {
   meetingId: string;
   cloudProjectNumber: string;
   accessToken: string;
+  spaceId?: string; // Skips the findByMeetingCode lookup when already known
   recordingQuality?: 'HD' | 'SD';
   includeAudio?: boolean;
   includeVideo?: boolean;
@@ -35,45 +36,58 @@ export interface RecordingSession {
 }
 
 export class GoogleMeetRecordingManager {
+  // One manager serves every recording; the access token comes with each
+  // RecordingConfig so a refreshed token is picked up on the next start
   private activeSessions = new Map<string, RecordingSession>();
-  private restService: GoogleMeetRESTService;
 
-  constructor(accessToken: string) {
-    this.restService = new GoogleMeetRESTService(accessToken);
-  }
-
-  async startRecording(config: RecordingConfig): Promise<string> {
+  /**
+   * Start recording a meeting; aborting the signal cancels a start that is still connecting
+   */
+  async startRecording(config: RecordingConfig, signal?: AbortSignal): Promise<string> {
     const sessionId = this.generateSessionId();
+    let mediaClient: MeetMediaAPIClient | null = null;
+    // Stops the conference poll if the connection setup fails first or the caller aborts
+    const conferenceWait = new AbortController();
+    const abortConferenceWait = () => conferenceWait.abort();
+    signal?.addEventListener('abort', abortConferenceWait);
     
     try {
+      signal?.throwIfAborted();
+
       console.log('Starting recording for meeting:', config.meetingCode);
 
+      const restService = new GoogleMeetRESTService(config.accessToken);
+
       // Step 1: Get meeting space information
-      const spaceId = await this.restService.getSpaceIdFromMeetingCode(config.meetingCode);
+      const spaceId = config.spaceId || await restService.getSpaceIdFromMeetingCode(config.meetingCode);
       const spaceName = `spaces/${spaceId}`;
       
       console.log('Found meeting space:', spaceName);
 
-      // Step 2: Wait for active conference
+      // Step 2: Create the Meet Media API client
+      mediaClient = new MeetMediaAPIClient({
+        cloudProjectNumber: config.cloudProjectNumber,
+        oAuthToken: config.accessToken,
+        meetingSpaceId: spaceId,
+        includeVideo: config.includeVideo,
+        recordingQuality: config.recordingQuality
+      });
+
+      // Steps 3 & 4: Wait for the active conference while the WebRTC
+      // connection is set up - neither depends on the other
       console.log('Waiting for active conference...');
-      const conference = await this.restService.waitForActiveConference(spaceName, 30000);
+      const [conference] = await Promise.all([
+        restService.waitForActiveConference(spaceName, 30000, 5000, conferenceWait.signal),
+        mediaClient.initializeConnection()
+      ]);
       
       if (!conference) {
         throw new Error('No active conference found');
       }
 
       console.log('Active conference found:', conference.name);
+      signal?.throwIfAborted();
 
-      // Step 3: Initialize Meet Media API client
-      const mediaClient = new MeetMediaAPIClient({
-        cloudProjectNumber: config.cloudProjectNumber,
-        oAuthToken: config.accessToken,
-        meetingSpaceId: spaceId
-      });
-
-      // Step 4: Initialize WebRTC connection
-      await mediaClient.initializeConnection();
-      
       // Step 5: Connect to the meeting
       await mediaClient.connectToMeeting();
 
@@ -97,7 +111,7 @@ export class GoogleMeetRecordingManager {
 
       this.activeSessions.set(sessionId, session);
 
-      // Step 9: Set up periodic chunk collection
+      // Step 9: Set up chunk collection
       this.startChunkCollection(sessionId);
 
       // Step 10: Set up participant monitoring
@@ -108,8 +122,20 @@ export class GoogleMeetRecordingManager {
 
     } catch (error) {
       console.error('Failed to start recording:', error);
-      this.cleanupSession(sessionId);
+      conferenceWait.abort();
+
+      if (this.activeSessions.has(sessionId)) {
+        this.cleanupSession(sessionId);
+      } else if (mediaClient) {
+        // Failed before the session was registered, so cleanupSession
+        // can't see this client - close its peer connection here
+        await mediaClient.disconnect().catch((disconnectError) => {
+          console.warn('Error disconnecting media client:', disconnectError);
+        });
+      }
       throw error;
+    } finally {
+      signal?.removeEventListener('abort', abortConferenceWait);
     }
   }
 
@@ -131,19 +157,17 @@ export class GoogleMeetRecordingManager {
       // Step 2: Disconnect from meeting
       await session.mediaClient.disconnect();
 
-      // Step 3: Combine all chunks if needed
-      const combinedBlob = await this.combineRecordingChunks(session);
-
-      // Step 4: Update session
+      // Step 3: Update session
       session.endTime = Date.now();
       session.status = 'stopped';
 
       console.log('Recording stopped successfully. Duration:', session.endTime - session.startTime);
 
-      // Step 5: Clean up
-      this.cleanupSession(sessionId);
+      // Step 4: Clean up (the media client was disconnected in step 2)
+      this.cleanupSession(sessionId, true);
 
-      return combinedBlob || finalBlob;
+      // The media client's blob already holds every recorded chunk
+      return finalBlob;
 
     } catch (error) {
       console.error('Failed to stop recording:', error);
@@ -153,148 +177,54 @@ export class GoogleMeetRecordingManager {
   }
 
   private async waitForMediaStreams(mediaClient: MeetMediaAPIClient, timeoutMs: number): Promise<void> {
-    const startTime = Date.now();
-    
-    while (Date.now() - startTime < timeoutMs) {
-      if (mediaClient.getConnectionState() === 'connected') {
-        // Wait a bit more for streams to be established
-        await new Promise(resolve => setTimeout(resolve, 2000));
-        return;
-      }
-      
-      await new Promise(resolve => setTimeout(resolve, 500));
+    try {
+      await mediaClient.waitForConnected(timeoutMs);
+    } catch (error) {
+      throw new Error('Timeout waiting for media streams');
     }
-    
-    throw new Error('Timeout waiting for media streams');
+    // mediaClient.startRecording() itself waits briefly for the first remote track
   }
 
   private startChunkCollection(sessionId: string): void {
     const session = this.activeSessions.get(sessionId);
     if (!session) return;
 
-    // Collect recording chunks every 5 seconds
-    const interval = setInterval(async () => {
-      const currentSession = this.activeSessions.get(sessionId);
-      if (!currentSession || currentSession.status !== 'recording') {
-        clearInterval(interval);
-        return;
-      }
-
-      try {
-        // Get current recording data (this would need to be implemented in the media client)
-        const chunk = await this.collectCurrentChunk(currentSession);
-        if (chunk) {
-          currentSession.chunks.push(chunk);
-          currentSession.totalSize += chunk.data.size;
-          
-          console.log(`Collected chunk ${currentSession.chunks.length}, size: ${chunk.data.size} bytes`);
-        }
-      } catch (error) {
-        console.error('Error collecting recording chunk:', error);
-      }
-    }, 5000);
-
-    // Store interval reference for cleanup
-    (session as any).chunkInterval = interval;
+    // The MediaRecorder pushes a chunk every second, so record each one as it arrives
+    session.mediaClient.onRecordingChunk = (data) => {
+      session.chunks.push({
+        data,
+        timestamp: Date.now(),
+        type: 'combined',
+        duration: 1000
+      });
+      session.totalSize += data.size;
+    };
   }
 
   private startParticipantMonitoring(sessionId: string): void {
     const session = this.activeSessions.get(sessionId);
     if (!session) return;
 
-    // Monitor participant changes every 10 seconds
-    const interval = setInterval(async () => {
-      const currentSession = this.activeSessions.get(sessionId);
-      if (!currentSession || currentSession.status !== 'recording') {
-        clearInterval(interval);
-        return;
-      }
-
-      try {
-        // This would get participant info from the media client or REST API
-        const participants = await this.getCurrentParticipants(currentSession);
-        currentSession.participants = participants;
-      } catch (error) {
-        console.error('Error monitoring participants:', error);
-      }
-    }, 10000);
-
-    // Store interval reference for cleanup
-    (session as any).participantInterval = interval;
-  }
-
-  private async collectCurrentChunk(session: RecordingSession): Promise<RecordingChunk | null> {
-    try {
-      // This is a placeholder - in a real implementation, you would:
-      // 1. Access the MediaRecorder from the MeetMediaAPIClient
-      // 2. Request current data chunks
-      // 3. Process and return the chunk
-
-      // For now, we'll simulate chunk collection
-      const mockChunk: RecordingChunk = {
-        data: new Blob([], { type: 'video/webm' }),
-        timestamp: Date.now(),
-        type: 'combined',
-        duration: 5000 // 5 seconds
-      };
-
-      return mockChunk;
-    } catch (error) {
-      console.error('Failed to collect chunk:', error);
-      return null;
-    }
-  }
-
-  private async getCurrentParticipants(session: RecordingSession): Promise<string[]> {
-    try {
-      // Get participant information from the meeting
-      const spaceName = `spaces/${await this.restService.getSpaceIdFromMeetingCode(session.meetingCode)}`;
-      
-      // In a real implementation, you would get this from the active conference
-      // For now, return empty array
-      return [];
-    } catch (error) {
-      console.error('Failed to get participants:', error);
-      return [];
-    }
-  }
-
-  private async combineRecordingChunks(session: RecordingSession): Promise<Blob | null> {
-    if (session.chunks.length === 0) {
-      return null;
-    }
-
-    try {
-      // Combine all chunks into a single blob
-      const allChunks = session.chunks.map(chunk => chunk.data);
-      const combinedBlob = new Blob(allChunks, { type: 'video/webm' });
-      
-      console.log(`Combined ${session.chunks.length} chunks into ${combinedBlob.size} bytes`);
-      
-      return combinedBlob;
-    } catch (error) {
-      console.error('Failed to combine chunks:', error);
-      return null;
-    }
+    // Participant changes are pushed over the data channel, so there is nothing to poll
+    session.participants = session.mediaClient.getParticipants().map(p => p.displayName);
+    session.mediaClient.onParticipantsChanged = (participants) => {
+      session.participants = participants.map(p => p.displayName);
+    };
   }
 
-  private cleanupSession(sessionId: string): void {
+  private cleanupSession(sessionId: string, alreadyDisconnected = false): void {
     const session = this.activeSessions.get(sessionId);
     if (!session) return;
 
-    // Clear intervals
-    if ((session as any).chunkInterval) {
-      clearInterval((session as any).chunkInterval);
-    }
-    if ((session as any).participantInterval) {
-      clearInterval((session as any).participantInterval);
-    }
+    // Detach callbacks
+    session.mediaClient.onRecordingChunk = undefined;
+    session.mediaClient.onParticipantsChanged = undefined;
 
-    // Clean up media client
-    try {
-      session.mediaClient.disconnect();
-    } catch (error) {
-      console.warn('Error disconnecting media client:', error);
+    // Clean up media client, unless the caller has just done so
+    if (!alreadyDisconnected) {
+      session.mediaClient.disconnect().catch((error) => {
+        console.warn('Error disconnecting media client:', error);
+      });
     }
 
     // Remove session
@@ -323,14 +253,15 @@ export class GoogleMeetRecordingManager {
 
   async forceStopAllRecordings(): Promise<void> {
     const sessions = Array.from(this.activeSessions.keys());
-    
-    for (const sessionId of sessions) {
+
+    // Sessions are independent, so stop them all at once
+    await Promise.all(sessions.map(async (sessionId) => {
       try {
         await this.stopRecording(sessionId);
       } catch (error) {
         console.error(`Failed to stop recording ${sessionId}:`, error);
       }
-    }
+    }));
   }
 }
 
@@ -0,0 +1,38 @@
+// Shared store of active recordings
+// Single in-process instance used by every recording API route
+
+import GoogleMeetRecordingManager from './recording-manager';
+
+export interface ActiveRecording {
+  sessionId: string;
+  meetingCode: string;
+  spaceId: string;
+  startTime: number;
+  startTimeISO: string; // startTime formatted once for status responses
+  status: 'starting' | 'connected' | 'recording' | 'cancelling' | 'error';
+  error?: string; // Set when a background start fails
+  startAbort?: AbortController; // Aborts a start that is still connecting
+  recordingManager: GoogleMeetRecordingManager;
+}
+
+// Keyed by meeting code - in production, use Redis or database
+export const activeRecordings = new Map<string, ActiveRecording>();
+
+// One manager for all sessions; it already tracks them by session ID
+export const recordingManager = new GoogleMeetRecordingManager();
+
+/**
+ * Count recordings that are starting or running, ignoring failed entries
+ * that are only kept around for status reporting
+ */
+export function countRunningRecordings(): number {
+  let count = 0;
+  for (const recording of activeRecordings.values()) {
+    if (recording.status !== 'error') {
+      count++;
+    }
+  }
+  return count;
+}
+
+export default activeRecordings;